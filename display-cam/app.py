@@ -3,21 +3,87 @@
 # Open http://localhost:8000
 
 import time
-from flask import Flask, Response, render_template_string, send_file
+from flask import Flask, Response, send_file
 from picamera2 import Picamera2
+from picamera2.encoders import JpegEncoder
+from picamera2.outputs import FileOutput
 import cv2
 import os
-from io import BytesIO
+import io
+import threading
 
 app = Flask(__name__)
 
+
+def _pin_thread(cpus, niceness=None):
+    # best effort: pinning needs >= 4 cores, raising priority needs
+    # CAP_SYS_NICE; silently skip where either is unavailable
+    if (os.cpu_count() or 1) < 4:
+        return
+    try:
+        os.sched_setaffinity(0, cpus)
+        if niceness is not None:
+            os.nice(niceness)
+    except (AttributeError, PermissionError, OSError):
+        pass
+
+
+class StreamingOutput(io.BufferedIOBase):
+    """Publishes encoded JPEG frames from the camera pipeline thread.
+
+    Single producer, any number of /stream subscribers: each write
+    replaces `latest` and wakes every waiting generator, so serving N
+    clients costs one encode instead of N capture+encode pipelines."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.latest = b""
+        self.gen = 0  # bumped per frame so slow clients can skip ahead
+        self._pinned = False
+
+    def write(self, buf):
+        if not self._pinned:
+            # first write runs on the encoder's (single, see below)
+            # worker thread: keep it on core 3, away from the Flask
+            # workers, for a steadier cadence
+            self._pinned = True
+            _pin_thread({3}, niceness=-5)
+        with self.cond:
+            self.latest = buf
+            self.gen += 1
+            self.cond.notify_all()
+        return len(buf)
+
+    def wait_frame(self, last_gen):
+        # always hands back the newest frame: a client that stalled while
+        # N frames were published silently drops the stale N-1 rather
+        # than queueing them
+        with self.cond:
+            self.cond.wait_for(lambda: self.gen != last_gen)
+            return self.latest, self.gen
+
+
 # --- Camera setup ---
 picam2 = Picamera2()
 CONFIG = picam2.create_preview_configuration(
-    main={"size": (1280, 720), "format": "RGB888"}  # tweak resolution if you want
+    # packed 24-bit stream; JpegEncoder reads the format from the config,
+    # so the stream path never needs a per-frame cvtColor regardless of
+    # channel order (the one-shot static capture below handles its own)
+    main={"size": (1280, 720), "format": "BGR888"}  # tweak resolution if you want
 )
 picam2.configure(CONFIG)
-picam2.start()
+# Encode in the camera pipeline (libjpeg-turbo) instead of per-frame in Python.
+# Ask for 4:2:0 chroma explicitly: ~30-40% smaller frames than 4:4:4 with no
+# visible difference on a stream, and fewer DCT blocks to encode.
+# num_threads=1: JpegEncoder defaults to a 4-thread pool, which would
+# spread encode work across all cores no matter what write() pins; one
+# thread handles 720p30 comfortably and inherits the core-3 affinity.
+output = StreamingOutput()
+try:
+    encoder = JpegEncoder(q=80, num_threads=1, colour_subsampling="420")
+except TypeError:
+    encoder = JpegEncoder(q=80, num_threads=1)  # older picamera2 without the option
+picam2.start_recording(encoder, FileOutput(output))
 time.sleep(0.3)  # warm-up
 
 # Enable continuous AF on Camera Module 3 (IMX708)
@@ -30,16 +96,22 @@ try:
     picam2.set_controls({"AfTrigger": controls.AfTrigger.Start})
 except Exception:
     pass  # ok on non-CM3 sensors
-    # Save a static image to serve on the webpage
-    STATIC_IMAGE_PATH = "static_lara.jpg"
-    if not os.path.exists(STATIC_IMAGE_PATH):
-        frame = picam2.capture_array()
-        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        cv2.imwrite(STATIC_IMAGE_PATH, bgr)
-
-    @app.route("/lara")
-    def lara_image():
-        return send_file(STATIC_IMAGE_PATH, mimetype="image/jpeg")
+
+# Save a static image to serve on the webpage
+STATIC_IMAGE_PATH = "static_lara.jpg"
+if not os.path.exists(STATIC_IMAGE_PATH):
+    # DRM naming quirk: the "BGR888" stream hands back RGB-ordered
+    # arrays, so imwrite still needs one swap here. Only this one-shot
+    # capture pays it; the stream path is format-aware in the encoder.
+    frame = picam2.capture_array()
+    cv2.imwrite(STATIC_IMAGE_PATH, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+
+
+@app.route("/lara")
+def lara_image():
+    return send_file(STATIC_IMAGE_PATH, mimetype="image/jpeg")
+
+
 HTML = """
 <!doctype html>
 <html>
@@ -92,21 +164,28 @@ HTML = """
   </body>
 </html>
 """
+# the page is fully static, so serve pre-encoded bytes (no Jinja2 per request)
+HTML_BYTES = HTML.encode("utf-8")
 
 
 @app.route("/")
 def index():
-    return render_template_string(HTML)
+    return Response(HTML_BYTES, mimetype="text/html")
+
+FRAME_HEADER = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+FRAME_TRAILER = b"\r\n"
+
 
-def mjpeg_generator(jpeg_quality=80):
+def mjpeg_generator():
+    # pure byte-shoveler: frames arrive already JPEG-encoded from the
+    # pipeline; yield boundary/payload/trailer separately so the JPEG
+    # bytes are never copied into a concatenated chunk
+    last_gen = 0
     while True:
-        frame = picam2.capture_array()
-        bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        ok, jpg = cv2.imencode(".jpg", bgr, [int(cv2.IMWRITE_JPEG_QUALITY), jpeg_quality])
-        if not ok:
-            continue
-        yield (b"--frame\r\n"
-               b"Content-Type: image/jpeg\r\n\r\n" + jpg.tobytes() + b"\r\n")
+        jpg, last_gen = output.wait_frame(last_gen)
+        yield FRAME_HEADER
+        yield jpg
+        yield FRAME_TRAILER
 
 @app.route("/stream")
 def stream():
@@ -115,18 +194,29 @@ def stream():
 
 @app.route("/snapshot")
 def snapshot():
-    # fast single capture without stopping stream
-    frame = picam2.capture_array()
-    bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-    ok, jpg = cv2.imencode(".jpg", bgr, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
-    bio = BytesIO(jpg.tobytes())
-    bio.seek(0)
-    return send_file(bio, mimetype="image/jpeg", download_name="snapshot.jpg")
+    # most recent encoded frame, served as-is: no extra capture, encode,
+    # or BytesIO copy. Right after startup latest may still be empty, so
+    # give the pipeline a moment rather than serving a zero-byte 200.
+    jpg = output.latest
+    if not jpg:
+        with output.cond:
+            output.cond.wait_for(lambda: output.latest, timeout=2.0)
+            jpg = output.latest
+    if not jpg:
+        return Response("no frame from camera yet", status=503,
+                        mimetype="text/plain")
+    return Response(jpg, mimetype="image/jpeg", headers={
+        "Content-Length": str(len(jpg)),
+        "Content-Disposition": 'inline; filename="snapshot.jpg"',
+    })
 
 @app.route("/healthz")
 def healthz():
     return "ok", 200
 
 if __name__ == "__main__":
+    # keep HTTP serving on cores 0-2 (worker threads inherit this mask),
+    # leaving core 3 to the encoder
+    _pin_thread({0, 1, 2})
     # localhost only; switch to 0.0.0.0 to view from other devices on your LAN
     app.run(host="0.0.0.0", port=8000, threaded=True)
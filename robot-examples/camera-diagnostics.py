@@ -1,10 +1,153 @@
+#!/usr/bin/env python3
+# Headless camera diagnostics: capture a reference frame with AUTO white
+# balance, then sweep a few manual colour gains, saving each frame plus
+# per-channel stats so tint problems can be diagnosed over SSH.
+
+import argparse
+import json
+import os
+import shutil
 import subprocess
-# Try new name first, fall back to old one
-for cmd in (["rpicam-still", "-o", "test.jpg"],
-            ["libcamera-still", "-o", "test.jpg"]):
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# cv2/numpy (and diag_utils, which needs both) back the Picamera2 flow;
+# the CLI fallback below must keep working on boxes that have neither
+try:
+    import cv2
+    import numpy as np
+
+    from diag_utils import (now_stamp, ensure_outdir, stats_rgb,
+                            verdict_from_stats, to_bgr, save_png_bgr)
+except ImportError:
+    cv2 = None
+
+# (red_gain, blue_gain) pairs for the manual sweep
+GAIN_SWEEP = [(1.0, 1.0), (1.5, 1.2), (2.0, 1.5), (2.5, 1.8), (3.0, 2.0)]
+
+
+def grayworld_awb(img_rgb):
+    # Gray-world correction: scale each channel so the means match.
+    means = np.array(cv2.mean(img_rgb)[:3])
+    # clamp the divisor: a dead channel on a dark frame (lens cap, no
+    # light) would otherwise divide by zero and NaN the gains
+    gains = means.mean() / np.maximum(means, 1e-3)
+    # convertScaleAbs scales with a saturating cast in one pass per
+    # channel - no float32 full-frame temporaries, no separate clip
+    balanced = cv2.merge([
+        cv2.convertScaleAbs(ch, alpha=float(a), beta=0)
+        for ch, a in zip(cv2.split(img_rgb), gains)
+    ])
+    return balanced, gains
+
+
+def init_picam2(vflip=False, hflip=False):
+    from picamera2 import Picamera2
+    from libcamera import Transform
+    picam2 = Picamera2()
+    config = picam2.create_still_configuration(
+        # DRM naming quirk: "BGR888" is what actually yields R,G,B byte
+        # order in capture_array, which is what stats_rgb/to_bgr assume
+        main={"size": (1280, 720), "format": "BGR888"},
+        # flip in the ISP instead of np.flipud/fliplr copies per frame
+        transform=Transform(vflip=vflip, hflip=hflip),
+    )
+    picam2.configure(config)
+    picam2.start()
+    time.sleep(0.5)  # one-time warm-up: let AE/AWB settle
+    return picam2
+
+
+def capture_rgb(picam2, gains=None):
+    if gains is not None:
+        # gains take effect within a frame or two; no full re-warm-up
+        picam2.set_controls({"AwbEnable": False, "ColourGains": gains})
+        time.sleep(0.1)
+    return picam2.capture_array()
+
+
+# resolve the capture CLI once (new name first, pre-Bookworm name second)
+# instead of letting exec fail its way down the PATH on every call
+_STILL = next((p for p in map(shutil.which,
+                              ("rpicam-still", "libcamera-still")) if p), None)
+
+
+def capture_fallback(path):
+    if _STILL is None:
+        raise RuntimeError('neither rpicam-still nor libcamera-still found on PATH')
+    subprocess.run([_STILL, "-o", path], check=True)
+    print("Picture saved as %s" % path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Headless Pi camera diagnostics')
+    ap.add_argument('--outdir', default='cam-diag')
+    ap.add_argument('--vflip', action='store_true')
+    ap.add_argument('--hflip', action='store_true')
+    args = ap.parse_args()
+
     try:
-        subprocess.run(cmd, check=True)
-        print("Picture saved as test.jpg")
-        break
-    except FileNotFoundError:
-        continue
+        import picamera2  # noqa: F401
+        have_picamera2 = True
+    except ImportError:
+        have_picamera2 = False
+
+    if not have_picamera2 or cv2 is None:
+        # no camera/vision stack: just grab one jpeg with the CLI tools,
+        # using nothing beyond the standard library
+        os.makedirs(args.outdir, exist_ok=True)
+        stamp = time.strftime('%Y-%m-%d-%H-%M-%S', time.localtime())
+        capture_fallback(os.path.join(args.outdir, 'auto_%s.jpg' % stamp))
+        return
+
+    outdir = ensure_outdir(args.outdir)
+    stamp = now_stamp()
+    summary = {'timestamp': stamp, 'captures': [], 'files': []}
+
+    # PNG encode+write happens in the background so the next
+    # set_controls/capture can overlap the previous frame's compression;
+    # each capture owns its frame, so there is no buffer-reuse race
+    pool = ThreadPoolExecutor(max_workers=2)
+
+    def record(label, rgb, fname):
+        st = stats_rgb(rgb)
+        fpath = os.path.join(outdir, fname)
+        pool.submit(save_png_bgr, fpath, to_bgr(rgb))
+        summary['captures'].append({
+            'label': label,
+            'stats': st,
+            'verdict': verdict_from_stats(st),
+        })
+        summary['files'].append(fpath)
+        print('%-16s means=%s -> %s' %
+              (label, ['%.1f' % m for m in st['means']],
+               summary['captures'][-1]['verdict']))
+
+    # open the camera once for the whole run
+    picam2 = init_picam2(vflip=args.vflip, hflip=args.hflip)
+
+    # reference shot with AUTO white balance
+    auto_rgb = capture_rgb(picam2)
+    record('auto', auto_rgb, 'auto_%s.png' % stamp)
+
+    # manual colour-gain sweep
+    for red, blue in GAIN_SWEEP:
+        rgb = capture_rgb(picam2, gains=(red, blue))
+        record('gains %.1f/%.1f' % (red, blue), rgb,
+               'gains_%.1f_%.1f_%s.png' % (red, blue, stamp))
+
+    picam2.stop()
+    picam2.close()
+
+    # software gray-world correction of the AUTO frame, for comparison
+    balanced, gw_gains = grayworld_awb(auto_rgb)
+    record('grayworld %s' % np.round(gw_gains, 2).tolist(), balanced,
+           'grayworld_%s.png' % stamp)
+
+    pool.shutdown(wait=True)  # all files on disk before the summary says so
+    with open(os.path.join(outdir, 'summary_%s.json' % stamp), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# Side-by-side colour-order preview: shows the captured frame next to its
+# channel-swapped view, each with per-channel means and a dominance hint,
+# to debug the blue-tint / RGB-vs-BGR confusion live.
+#   c: toggle the compare panel   s: save the frame   q: quit
+
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def hint_from_means(means):
+    r, g, b = means
+    avg = (r + g + b) / 3.0
+    if avg < 1.0:
+        return 'too dark to judge'
+    if b > 1.4 * avg:
+        return 'blue dominant - channel swap or AWB off?'
+    if r > 1.4 * avg:
+        return 'red dominant - channel swap or AWB off?'
+    if b < 0.6 * avg:
+        return 'blue weak'
+    if r < 0.6 * avg:
+        return 'red weak'
+    return 'balanced'
+
+
+# Hershey glyph rasterization is the expensive part of the overlay and
+# the label/hint strings are drawn from a small fixed set, so render each
+# one once into a black sprite and blit it; only the numbers go through
+# putText every frame.
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_sprite_cache = {}
+
+
+def _text_sprite(text, color):
+    key = (text, color)
+    sprite = _sprite_cache.get(key)
+    if sprite is None:
+        sprite = np.zeros((30, 420, 3), np.uint8)
+        cv2.putText(sprite, text, (4, 24), _FONT, 0.6, color, 1)
+        _sprite_cache[key] = sprite
+    return sprite
+
+
+def overlay_stats(img, label):
+    # draws in place: callers hand over private buffers, so no defensive
+    # copy; cv2.mean is one vectorized pass over the uint8 frame instead
+    # of a float64 NumPy reduction. Sample every 8th row: rows stay
+    # contiguous, so OpenCV maps the view directly as a Mat - striding
+    # the columns too would make it silently copy the sample every call.
+    # 1/8 of the frame is still far more than the coarse 0.6x/1.4x hint
+    # thresholds need.
+    means = cv2.mean(img[::8])[:3]
+    np.copyto(img[4:34, 4:424], _text_sprite(label, (255, 255, 255)))
+    np.copyto(img[34:64, 4:424], _text_sprite(hint_from_means(means),
+                                              (0, 255, 255)))
+    # only the numbers change frame to frame
+    cv2.putText(img, '%.0f %.0f %.0f' % tuple(means),
+                (290, 28), _FONT, 0.6, (255, 255, 255), 1)
+    return img
+
+
+def stack_h(img_left, img_right):
+    # both panels come from the same frame in the preview loop, so skip
+    # the bilinear resizes and join with a straight vectorized copy
+    if img_left.shape[0] == img_right.shape[0]:
+        return cv2.hconcat([img_left, img_right])
+    # fallback for genuinely mismatched heights
+    h = img_left.shape[0]
+    right = cv2.resize(
+        img_right, (int(img_right.shape[1] * h / img_right.shape[0]), h))
+    return np.hstack([img_left, right])
+
+
+# saves happen on a background thread so PNG encode + disk IO never
+# stall the preview loop; a small bounded queue drops bursts instead of
+# letting them back up realtime capture
+_save_q = queue.Queue(maxsize=4)
+
+
+def _save_worker():
+    while True:
+        frame, is_rgb = _save_q.get()
+        name = 'preview_%s.png' % time.strftime('%Y-%m-%d-%H-%M-%S')
+        if is_rgb:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        cv2.imwrite(name, frame)
+        print('saved %s' % name)
+
+
+threading.Thread(target=_save_worker, daemon=True).start()
+
+
+def save_frame(frame, is_rgb=True):
+    try:
+        _save_q.put_nowait((frame, is_rgb))
+    except queue.Full:
+        print('save queue full, frame dropped')
+
+
+def run_picamera2():
+    from picamera2 import Picamera2, MappedArray
+    picam2 = Picamera2()
+    size = (1280, 720)
+    config = picam2.create_preview_configuration(
+        # DRM naming quirk: "BGR888" is what actually delivers R,G,B
+        # byte order, which the panel labels and the save path assume
+        main={"size": size, "format": "BGR888"},
+        # cheap luma-only stream for the non-compare mode; two buffers
+        # keep CMA usage down without starving the pipeline
+        lores={"size": size, "format": "YUV420"},
+        buffer_count=2,
+    )
+    picam2.configure(config)
+    picam2.start()
+    time.sleep(0.3)  # warm-up
+    compare = True
+    disp_buf = None  # persistent composite, allocated on first use
+    frame_idx = 0
+    try:
+        while True:
+            if compare:
+                # Map the pipeline's DMA buffer directly rather than
+                # letting capture_array memcpy it into fresh Python-owned
+                # memory; the frame is only read here. frame[..., ::-1]
+                # is a zero-copy channel-swapped view (no cvtColor
+                # memcpy), and both panels land in one preallocated
+                # composite instead of a fresh 5.4 MB hconcat result per
+                # frame. Release the request as soon as the panel copies
+                # are done so the buffer recycles into the pipeline.
+                request = picam2.capture_request()
+                try:
+                    with MappedArray(request, "main") as m:
+                        frame = m.array
+                        h, w = frame.shape[:2]
+                        if disp_buf is None or disp_buf.shape[0] != h \
+                                or disp_buf.shape[1] != 2 * w:
+                            disp_buf = np.empty((h, 2 * w, 3), np.uint8)
+                        np.copyto(disp_buf[:, :w], frame)
+                        np.copyto(disp_buf[:, w:], frame[..., ::-1])
+                finally:
+                    request.release()
+                disp = disp_buf
+                overlay_stats(disp[:, :w], 'RGB means:')
+                overlay_stats(disp[:, w:], 'BGR view means:')
+            else:
+                # lores mode: the Y plane is a third of the YUV buffer
+                # and a sixth of the RGB copy - plenty for framing and
+                # exposure checks between compares
+                yuv = picam2.capture_array("lores")
+                disp = yuv[:size[1], :size[0]]
+                mean_y = cv2.mean(disp[::8])[0]  # row-strided: no hidden copy
+                cv2.rectangle(disp, (4, 4), (430, 34), 0, -1)
+                cv2.putText(disp, 'Y mean: %.0f (c: RGB compare)' % mean_y,
+                            (8, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 255, 1)
+            cv2.imshow('preview-compare', disp)
+
+            # waitKey pumps the whole GUI event loop, a surprisingly big
+            # slice of the frame budget; polling every 3rd frame still
+            # reacts within ~100 ms at 30 FPS
+            frame_idx += 1
+            if frame_idx % 3:
+                continue
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('c'):
+                compare = not compare
+            elif key == ord('s'):
+                save_frame(picam2.capture_array("main"))
+    finally:
+        picam2.stop()
+        picam2.close()
+        cv2.destroyAllWindows()
+
+
+def run_opencv():
+    cap = cv2.VideoCapture(0)
+    if not cap.isOpened():
+        raise RuntimeError('no camera found')
+    # default V4L2 queue is ~4 frames (~130 ms of lag at 30 FPS); keep a
+    # single buffer so the diagnostic shows the live scene, and prefer
+    # MJPG over raw YUYV to save USB bandwidth on webcams
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    compare = True
+    frame_idx = 0
+    try:
+        while True:
+            ok, bgr = cap.read()
+            if not ok:
+                break
+            if compare:
+                # same zero-copy swapped view as the Picamera2 path
+                disp = stack_h(bgr, bgr[..., ::-1])
+                w = bgr.shape[1]
+                overlay_stats(disp[:, :w], 'BGR means:')
+                overlay_stats(disp[:, w:], 'RGB view means:')
+            else:
+                disp = overlay_stats(bgr, 'BGR means:')
+            cv2.imshow('preview-compare', disp)
+
+            # same 10 Hz key polling as the Picamera2 loop
+            frame_idx += 1
+            if frame_idx % 3:
+                continue
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('c'):
+                compare = not compare
+            elif key == ord('s'):
+                # in plain mode the overlay was drawn on bgr in place, so
+                # grab a fresh frame rather than saving the annotated one;
+                # compare mode only annotates the composite, leaving bgr
+                # pristine. Either way the PNG encode stays off this loop.
+                if not compare:
+                    ok, bgr = cap.read()
+                if ok:
+                    save_frame(bgr, is_rgb=False)
+    finally:
+        cap.release()
+        cv2.destroyAllWindows()
+
+
+def main():
+    try:
+        import picamera2  # noqa: F401
+    except ImportError:
+        run_opencv()
+    else:
+        run_picamera2()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,10 @@
 from vilib import Vilib
-from time import sleep, time, strftime, localtime
+from time import time, strftime, localtime
+import queue
 import threading
 from os import getlogin
 import cv2
+import readchar
 
 USERNAME = getlogin()
 PICTURE_PATH = f"/home/{USERNAME}/Pictures/"
@@ -35,19 +37,22 @@ def face_detect(flag):
     Vilib.face_detect_switch(flag)
 
 
+_qr_stop = threading.Event()
+
+
 def qrcode_detect():
-    global qr_code_flag
-    if qr_code_flag:
-        Vilib.qrcode_detect_switch(True)
-        print("Waiting for QR code")
+    Vilib.qrcode_detect_switch(True)
+    print("Waiting for QR code")
 
     text = None
-    while qr_code_flag:
+    while not _qr_stop.is_set():
         temp = Vilib.detect_obj_parameter['qr_data']
         if temp != "None" and temp != text:
             text = temp
             print('QR code:%s' % text)
-        sleep(0.5)
+        # wait() doubles as the poll interval but returns the moment the
+        # toggle sets the event, so shutdown is immediate
+        _qr_stop.wait(0.5)
     Vilib.qrcode_detect_switch(False)
 
 
@@ -57,8 +62,8 @@ def take_photo():
     # Grab a frame directly, fix colors, and save
     frame = Vilib.frame_array()
     if frame is not None:
-        frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        cv2.imwrite(f"{PICTURE_PATH}{name}.jpg", frame_bgr)
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        cv2.imwrite(f"{PICTURE_PATH}{name}.jpg", frame)
         print(f'photo saved as {PICTURE_PATH}{name}.jpg')
     else:
         print("Error: could not capture photo")
@@ -95,15 +100,34 @@ def fixed_frame_display(img):
     return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
 
 
-# 🔧 Fix color swap for web streaming
-def fixed_web_frame(img):
-    if img is None:
-        return None
-    img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-    ret, jpeg = cv2.imencode('.jpg', img_bgr)
-    if ret:
-        return jpeg.tobytes()
-    return None
+# 🔧 Fix color swap for web streaming. Encodes lazily: the web client
+# often pulls slower than the camera produces, so convert + JPEG-encode
+# only when a new frame object arrives and hand back the cached bytes
+# otherwise.
+class _WebFrameEncoder:
+    def __init__(self, quality=75):
+        self.quality = quality
+        self._last_frame = None  # keeps the frame alive so identity is stable
+        self._jpeg = None
+
+    def __call__(self, img):
+        if img is None:
+            return None
+        if img is not self._last_frame:
+            img_bgr = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+            ret, jpeg = cv2.imencode(
+                '.jpg', img_bgr, [cv2.IMWRITE_JPEG_QUALITY, self.quality,
+                                  cv2.IMWRITE_JPEG_OPTIMIZE, 0])
+            if not ret:
+                return None
+            self._last_frame = img
+            # Vilib concatenates the frame onto the multipart boundary
+            # with bytes +, so this must be real bytes, not a memoryview
+            self._jpeg = jpeg.tobytes()
+        return self._jpeg
+
+
+fixed_web_frame = _WebFrameEncoder()
 
 
 # Apply patches
@@ -111,6 +135,17 @@ Vilib.frame_display = fixed_frame_display
 Vilib.web_frame_display = fixed_web_frame
 
 
+# single keystrokes from a reader thread, like the other examples:
+# input() is line-buffered and the old loop slept 0.5 s per command,
+# so nothing could react faster than Enter + half a second
+_key_q = queue.Queue()
+
+
+def key_reader_thread():
+    while True:
+        _key_q.put(readchar.readkey().lower())
+
+
 def main():
     global flag_face, flag_color, qr_code_flag
     qrcode_thread = None
@@ -119,10 +154,21 @@ def main():
     Vilib.display(local=True, web=True)   # now uses patched functions
     print(MANUAL)
 
-    while True:
-        key = input().lower()
+    _key_t = threading.Thread(target=key_reader_thread, daemon=True)
+    _key_t.start()
 
-        if key == 'q':
+    while True:
+        key = _key_q.get()  # blocks until a keypress, no polling
+
+        # readkey() keeps the tty raw, so Ctrl+C arrives as a key
+        # instead of raising KeyboardInterrupt - quit cleanly like
+        # treasure_hunt does
+        if key == readchar.key.CTRL_C:
+            _qr_stop.set()
+            Vilib.camera_close()
+            print('\nquit')
+            break
+        elif key == 'q':
             take_photo()
         elif key in ('0123456'):
             index = int(key)
@@ -140,17 +186,17 @@ def main():
             qr_code_flag = not qr_code_flag
             if qr_code_flag:
                 if qrcode_thread is None or not qrcode_thread.is_alive():
+                    _qr_stop.clear()
                     qrcode_thread = threading.Thread(target=qrcode_detect, daemon=True)
                     qrcode_thread.start()
             else:
                 if qrcode_thread and qrcode_thread.is_alive():
+                    _qr_stop.set()
                     qrcode_thread.join()
                     print('QRcode Detect: close')
         elif key == "s":
             object_show()
 
-        sleep(0.5)
-
 
 if __name__ == "__main__":
     main()
@@ -30,6 +30,7 @@ key_dict = {
     'a': 'turn_left',
     'd': 'turn_right',
 }
+move_keys = frozenset(key_dict)
 def renew_color_detect():
     global color
     color = random.choice(color_list)
@@ -38,9 +39,12 @@ def renew_color_detect():
 
 key = None
 lock = threading.Lock()
+cond = threading.Condition(lock)  # wakes main the moment a key lands
 def key_scan_thread():
     global key
     while True:
+        # readkey() already blocks on stdin, so no sleep is needed here;
+        # an extra delay just burns 100 wakeups/s while idle
         key_temp = readchar.readkey()
         print('\r',end='')
         with lock:
@@ -49,8 +53,9 @@ def key_scan_thread():
                 key = 'space'
             elif key == readchar.key.CTRL_C:
                 key = 'quit'
+            cond.notify()
+            if key == 'quit':
                 break
-        sleep(0.01)
 
 def main():
     global key
@@ -76,9 +81,9 @@ def main():
             sleep(0.05)   
             renew_color_detect()
 
-        with lock:
-            if key != None and key in ('wsad'):
-                action = key_dict[str(key)]
+        with cond:
+            if key is not None and key in move_keys:
+                action = key_dict[key]
                 key =  None
             elif key == 'space':
                 tts.say("Look for " + color)
@@ -86,15 +91,18 @@ def main():
             elif key == 'quit':
                 _key_t.join()
                 Vilib.camera_close()
-                print("\n\rQuit") 
-                break 
+                print("\n\rQuit")
+                break
+            if action == None:
+                # instead of an unconditional 50 ms sleep per lap, block
+                # until the scan thread signals a key; the timeout keeps
+                # the colour check polling at the same 20 Hz worst case
+                cond.wait(timeout=0.05)
 
         if action != None:
-            crawler.do_action(action,1,speed)  
+            crawler.do_action(action,1,speed)
             action = None
 
-        sleep(0.05)          
-     
 
 if __name__ == "__main__":
     main()
@@ -1,21 +1,44 @@
+import functools
+import types
+
 import arxiv
 
-client = arxiv.Client()
+# smaller pages mean the first results arrive after one short fetch
+# instead of one big one; the shared client keeps the HTTP session warm
+client = arxiv.Client(page_size=25)
 
-def search_arxiv(title: str, papers_count: int):
+def iter_arxiv(title: str, papers_count: int):
+    """Yield paper dicts lazily so callers can stop early.
+
+    Results stream in page by page; always hits the API. Use
+    search_arxiv for the cached variant.
+    """
     search_query = f'all:"{title}"'
     search = arxiv.Search(
         query=search_query,
         max_results=papers_count,
         sort_by=arxiv.SortCriterion.Relevance
     )
-    papers = []
-    results = client.results(search)
-    for result in results:
-        paper = {
+    for result in client.results(search):
+        yield {
             'title': result.title,
             'authors': [author.name for author in result.authors],
             'summary': result.summary,
             'published': result.published,
             'url': result.entry_id
-        }
\ No newline at end of file
+        }
+
+@functools.lru_cache(maxsize=128)
+def search_arxiv(title: str, papers_count: int):
+    """Cached search: identical queries return instantly instead of
+    re-hitting the rate-limited arxiv API.
+
+    Returns a tuple of read-only mappings: the same objects are handed
+    to every caller, so a writable dict would let one caller's edits
+    leak into everyone else's results.
+    """
+    frozen = []
+    for paper in iter_arxiv(title, papers_count):
+        paper['authors'] = tuple(paper['authors'])
+        frozen.append(types.MappingProxyType(paper))
+    return tuple(frozen)